@@ -0,0 +1,189 @@
+import unicodedata
+import pandas as pd
+import numpy as np
+
+# Diccionario de mapeo de países (insensible a mayúsculas/minúsculas)
+COUNTRY_ALIASES = {
+    # America
+    'united states': 'USA',
+    'united states of america': 'USA',
+    'estados unidos': 'USA',
+    'us': 'USA',
+    'usa': 'USA',
+    'u.s.a.': 'USA',
+    'u.s.': 'USA',
+
+    # Asia
+    'south korea': 'Korea',
+    'corea del sur': 'Korea',
+    'republic of korea': 'Korea',
+    'korea, south': 'Korea',
+    'korea, republic of': 'Korea',
+    'korea': 'Korea',
+    'north korea': 'North Korea',
+    'corea del norte': 'North Korea',
+
+    # Europa
+    'russian federation': 'Russia',
+    'federacion rusa': 'Russia',
+    'russia': 'Russia',
+
+    'united kingdom': 'UK',
+    'reino unido': 'UK',
+    'great britain': 'UK',
+    'england': 'UK',
+    'uk': 'UK',
+    'u.k.': 'UK',
+
+    #  Bosnia
+    'bosnia and herzegovina': 'Bosnia and Herzegovina',
+    'bosnia & herzegovina': 'Bosnia and Herzegovina',
+    'bosnia': 'Bosnia and Herzegovina',
+    'herzegovina': 'Bosnia and Herzegovina',
+
+    'czechia': 'Czech Republic',
+    'czech republic': 'Czech Republic',
+}
+
+MINOR_WORDS = ['and', 'of', 'the', 'du', 'de', 'del', 'la', 'el']
+
+# Función para normalizar nombres de países
+def normalize_country_name(country):
+    if not isinstance(country, str):
+        return country
+
+    # Eliminar acentos y espacios extras
+    country = unicodedata.normalize('NFKD', country).encode('ASCII', 'ignore').decode('utf-8').strip()
+
+    # Buscar coincidencia en el diccionario (insensible a mayúsculas/minúsculas)
+    normalized_country = COUNTRY_ALIASES.get(country.lower())
+
+    if normalized_country:
+        return normalized_country
+    else:
+        # Si no hay coincidencia en el mapeo, aplicar formato de título estándar
+        # Pero manejar palabras como "and", "of", etc. correctamente
+        words = country.split()
+        if len(words) > 1:
+            titled_words = []
+            for i, word in enumerate(words):
+                if i > 0 and word.lower() in MINOR_WORDS:
+                    titled_words.append(word.lower())
+                else:
+                    titled_words.append(word.capitalize())
+            return ' '.join(titled_words)
+        else:
+            # Para nombres de una sola palabra
+            return country.capitalize()
+
+class CountryDimension:
+    # Dimensión de países construida una vez por ejecución y persistida entre
+    # ejecuciones. Cada país canónico recibe un id int32 que indexa los arrays
+    # de atributos; los nombres de entrada se normalizan una sola vez por valor
+    # distinto, no por fila. Los países nuevos se registran en orden alfabético
+    # para que los ids no dependan del orden de lectura de las fuentes.
+    def __init__(self):
+        self._canonical_ids = {}
+        self._alias_ids = {}
+        self.names = []
+        self.continentes = []
+        self.regiones = []
+        self.aliases = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add_country(self, canonical):
+        country_id = len(self.names)
+        self._canonical_ids[canonical] = country_id
+        self.names.append(canonical)
+        self.continentes.append(None)
+        self.regiones.append(None)
+        self.aliases.append(set())
+        return country_id
+
+    def _get_id(self, name, add_missing):
+        country_id = self._alias_ids.get(name)
+        if country_id is not None:
+            return country_id
+
+        canonical = normalize_country_name(name)
+        country_id = self._canonical_ids.get(canonical)
+        if country_id is None:
+            if not add_missing:
+                return -1
+            country_id = self._add_country(canonical)
+
+        self._alias_ids[name] = country_id
+        self.aliases[country_id].add(name)
+        return country_id
+
+    def register(self, names):
+        # Añade los países aún desconocidos ordenados por nombre canónico
+        uniques = pd.unique(pd.Series(names, dtype=object).dropna())
+        canonical_names = {normalize_country_name(name) for name in uniques if name not in self._alias_ids}
+        for canonical in sorted(canonical_names - set(self._canonical_ids)):
+            self._add_country(canonical)
+
+    def encode(self, names, add_missing=True):
+        # Ids int32 por fila; -1 para nulos (o desconocidos si add_missing=False)
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        unique_ids = np.array([self._get_id(name, add_missing) for name in uniques], dtype=np.int32)
+        ids = np.full(len(codes), -1, dtype=np.int32)
+        valid = codes >= 0
+        ids[valid] = unique_ids[codes[valid]]
+        return ids
+
+    def decode(self, ids):
+        ids = np.asarray(ids)
+        names = np.asarray(self.names + [np.nan], dtype=object)
+        # El id -1 apunta al último elemento, que es el nulo añadido
+        return names[np.where(ids >= 0, ids, len(self.names))]
+
+    def reset_attributes(self):
+        # Los atributos se recalculan en cada ejecución a partir de las fuentes
+        self.continentes = [None] * len(self.names)
+        self.regiones = [None] * len(self.names)
+
+    def set_attributes(self, ids, continentes=None, regiones=None):
+        # Completa los atributos que aún faltan; el primer valor no nulo de cada país se conserva
+        for values, target in ((continentes, self.continentes), (regiones, self.regiones)):
+            if values is None:
+                continue
+            pairs = pd.DataFrame({'id_pais': ids, 'valor': np.asarray(values, dtype=object)})
+            pairs = pairs[(pairs['id_pais'] >= 0) & pairs['valor'].notna()].drop_duplicates(subset=['id_pais'])
+            for country_id, value in zip(pairs['id_pais'].to_numpy(), pairs['valor'].to_numpy()):
+                if target[country_id] is None:
+                    target[country_id] = value
+
+    def attribute(self, ids, attribute_name):
+        # Atributo por fila como Categorical: solo se reindexan códigos enteros
+        values = self.continentes if attribute_name == 'continente' else self.regiones
+        per_country = pd.Categorical(values)
+        ids = np.asarray(ids)
+        if not len(values):
+            return pd.Categorical.from_codes(np.full(len(ids), -1), per_country.categories)
+        codes = np.where(ids >= 0, per_country.codes[np.clip(ids, 0, None)], -1)
+        return pd.Categorical.from_codes(codes, per_country.categories)
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'id_pais': np.arange(len(self.names), dtype=np.int32),
+            'pais': self.names,
+            'continente': self.continentes,
+            'region': self.regiones,
+            'alias': ['; '.join(sorted(str(alias) for alias in aliases)) for aliases in self.aliases],
+        })
+
+    @classmethod
+    def from_frame(cls, frame):
+        dimension = cls()
+        for row in frame.sort_values('id_pais').itertuples(index=False):
+            # Los ids guardados son consecutivos desde 0, así que se conservan al recrearlos
+            country_id = dimension._add_country(row.pais)
+            dimension.continentes[country_id] = row.continente if pd.notna(row.continente) else None
+            dimension.regiones[country_id] = row.region if pd.notna(row.region) else None
+            for alias in str(row.alias).split('; ') if pd.notna(row.alias) and row.alias else []:
+                dimension._alias_ids[alias] = country_id
+                dimension.aliases[country_id].add(alias)
+        return dimension
@@ -0,0 +1,191 @@
+import os
+import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+from datetime import datetime
+
+HISTORY_DIR = "./historico"
+# Con microsegundos: dos cargas seguidas nunca comparten partición
+LOAD_ID_FORMAT = "%Y-%m-%dT%H-%M-%S-%f"
+PARTITION_PREFIX = "fecha_carga="
+CHANGES_FILE = "cambios.parquet"
+CHECKPOINT_FILE = "checkpoint.parquet"
+# El estado completo se guarda junto a una partición cuando las filas escritas
+# desde el último checkpoint superan el tamaño del estado: las consultas as-of
+# nunca releen más filas que las de un checkpoint y el almacenamiento sigue
+# creciendo en proporción a las filas modificadas
+
+# Columnas internas de cada partición
+HASH_COL = "_hash_fila"
+DELETED_COL = "_eliminado"
+LOAD_COL = "fecha_carga"
+
+# Historial versionado: cada carga se guarda como una partición Parquet
+# append-only con solo las filas nuevas o modificadas y marcas de borrado.
+# `estado_actual.parquet` guarda clave + hash de la última versión para
+# detectar cambios sin releer el historial.
+def get_dataset_dir(dataset):
+    return os.path.join(HISTORY_DIR, dataset)
+
+def get_partition_dir(dataset, version):
+    return os.path.join(get_dataset_dir(dataset), f"{PARTITION_PREFIX}{version}")
+
+def normalize_load_id(value):
+    # Acepta datetime, 'YYYY-MM-DD' (hasta el final de ese día) o un id de carga completo
+    if value is None:
+        return datetime.now().strftime(LOAD_ID_FORMAT)
+    if isinstance(value, datetime):
+        return value.strftime(LOAD_ID_FORMAT)
+    value = str(value)
+    if len(value) == 10:
+        return f"{value}T23-59-59-999999"
+    return value
+
+def compute_row_hashes(df, key_col):
+    # Hash de contenido por fila, independiente del orden de las columnas
+    value_cols = sorted(col for col in df.columns if col not in (key_col, HASH_COL, DELETED_COL, LOAD_COL))
+    return pd.util.hash_pandas_object(df[value_cols], index=False).to_numpy(dtype=np.uint64)
+
+def list_versions(dataset):
+    dataset_dir = get_dataset_dir(dataset)
+    if not os.path.isdir(dataset_dir):
+        return []
+    return sorted(name[len(PARTITION_PREFIX):] for name in os.listdir(dataset_dir) if name.startswith(PARTITION_PREFIX))
+
+def save_version(df, dataset, key_col, load_time=None):
+    try:
+        if df.empty or key_col not in df.columns:
+            raise ValueError(f"No hay datos o falta la columna clave '{key_col}'")
+
+        load_id = normalize_load_id(load_time)
+        dataset_dir = get_dataset_dir(dataset)
+        state_path = os.path.join(dataset_dir, "estado_actual.parquet")
+
+        new_df = df.drop_duplicates(subset=[key_col], keep='last').reset_index(drop=True)
+        new_df[HASH_COL] = compute_row_hashes(new_df, key_col)
+
+        if os.path.exists(state_path):
+            current_state = pd.read_parquet(state_path)
+        else:
+            current_state = pd.DataFrame({key_col: pd.Series(dtype=new_df[key_col].dtype), HASH_COL: pd.Series(dtype=np.uint64)})
+
+        # Filas nuevas o con contenido distinto al de la última versión.
+        # Se evita map/merge para no convertir los hashes uint64 a float.
+        current_hashes = current_state.set_index(key_col)[HASH_COL]
+        known_mask = new_df[key_col].isin(current_hashes.index).to_numpy()
+        previous_hashes = np.zeros(len(new_df), dtype=np.uint64)
+        previous_hashes[known_mask] = current_hashes.reindex(new_df.loc[known_mask, key_col]).to_numpy(dtype=np.uint64)
+        changed_mask = ~known_mask | (previous_hashes != new_df[HASH_COL].to_numpy())
+        changed_df = new_df[changed_mask].assign(**{DELETED_COL: False})
+
+        # Claves que ya no aparecen en la carga: se guardan como marcas de borrado
+        deleted_keys = current_state.loc[~current_state[key_col].isin(new_df[key_col]), key_col]
+        deleted_df = pd.DataFrame({key_col: deleted_keys.to_numpy(), DELETED_COL: True})
+
+        if changed_df.empty and deleted_df.empty:
+            print(f"Historial '{dataset}': sin cambios respecto a la última versión, no se crea partición")
+            return None
+
+        # Las particiones son append-only: nunca se sobrescribe una carga existente
+        partition_dir = get_partition_dir(dataset, load_id)
+        if os.path.exists(partition_dir):
+            raise ValueError(f"Ya existe una partición para la carga {load_id}")
+        os.makedirs(partition_dir)
+
+        partition_df = pd.concat([changed_df, deleted_df], ignore_index=True)
+        partition_df.to_parquet(os.path.join(partition_dir, CHANGES_FILE), index=False)
+
+        new_df[[key_col, HASH_COL]].to_parquet(state_path, index=False)
+        print(f"Historial '{dataset}': versión {load_id} guardada ({len(changed_df)} filas nuevas o modificadas, {len(deleted_df)} eliminadas, {len(new_df) - len(changed_df)} sin cambios)")
+
+        if count_rows_since_checkpoint(dataset) > len(new_df):
+            write_checkpoint(dataset, key_col, load_id)
+        return load_id
+
+    except Exception as e:
+        print(f"Error al guardar la versión de '{dataset}': {str(e)}")
+        return None
+
+def count_rows_since_checkpoint(dataset):
+    # Filas de las particiones posteriores al último checkpoint, leídas de los metadatos Parquet
+    count = 0
+    for version in reversed(list_versions(dataset)):
+        partition_dir = get_partition_dir(dataset, version)
+        if os.path.exists(os.path.join(partition_dir, CHECKPOINT_FILE)):
+            break
+        count += pq.read_metadata(os.path.join(partition_dir, CHANGES_FILE)).num_rows
+    return count
+
+def write_checkpoint(dataset, key_col, load_id):
+    # Estado completo en `load_id`, con el hash y la fecha de carga de cada fila
+    checkpoint_df = read_as_of(dataset, key_col, load_id, keep_hash=True)
+    checkpoint_df[DELETED_COL] = False
+    checkpoint_df.to_parquet(os.path.join(get_partition_dir(dataset, load_id), CHECKPOINT_FILE), index=False)
+    print(f"Historial '{dataset}': checkpoint guardado en la versión {load_id} ({len(checkpoint_df)} filas)")
+
+def read_as_of(dataset, key_col, as_of=None, keep_hash=False):
+    # Estado del dataset en la fecha `as_of`: última versión de cada clave, sin las eliminadas
+    as_of_id = normalize_load_id(as_of)
+    versions = [version for version in list_versions(dataset) if version <= as_of_id]
+    if not versions:
+        return pd.DataFrame()
+
+    # Partir del último checkpoint anterior a la fecha y aplicar solo las particiones posteriores
+    partitions = []
+    first_partition = 0
+    for position in range(len(versions) - 1, -1, -1):
+        checkpoint_path = os.path.join(get_partition_dir(dataset, versions[position]), CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            partitions.append(pd.read_parquet(checkpoint_path))
+            first_partition = position + 1
+            break
+
+    for version in versions[first_partition:]:
+        partition_df = pd.read_parquet(os.path.join(get_partition_dir(dataset, version), CHANGES_FILE))
+        partition_df[LOAD_COL] = version
+        partitions.append(partition_df)
+
+    # Las particiones están en orden cronológico: la última aparición de cada clave gana
+    history_df = pd.concat(partitions, ignore_index=True)
+    latest_df = history_df.drop_duplicates(subset=[key_col], keep='last')
+    latest_df = latest_df[~latest_df[DELETED_COL].astype(bool)].drop(columns=[DELETED_COL])
+    if not keep_hash:
+        latest_df = latest_df.drop(columns=[HASH_COL])
+    return latest_df.reset_index(drop=True)
+
+def diff_versions(dataset, key_col, from_load, to_load):
+    # Filas agregadas, eliminadas o modificadas entre dos cargas, comparando solo hashes
+    before_df = read_as_of(dataset, key_col, from_load, keep_hash=True)
+    after_df = read_as_of(dataset, key_col, to_load, keep_hash=True)
+    if before_df.empty and after_df.empty:
+        return pd.DataFrame()
+    if before_df.empty:
+        return after_df.drop(columns=[HASH_COL]).assign(cambio='agregado')
+    if after_df.empty:
+        return before_df.drop(columns=[HASH_COL]).assign(cambio='eliminado')
+
+    # Hashes como UInt64 nulable para que el merge externo no los convierta a float
+    comparison = pd.merge(
+        before_df[[key_col, HASH_COL]].astype({HASH_COL: 'UInt64'}),
+        after_df[[key_col, HASH_COL]].astype({HASH_COL: 'UInt64'}),
+        on=key_col,
+        how='outer',
+        suffixes=('_antes', '_despues'),
+        indicator=True
+    )
+    change = np.select(
+        [
+            comparison['_merge'] == 'right_only',
+            comparison['_merge'] == 'left_only',
+            (comparison[f'{HASH_COL}_antes'] != comparison[f'{HASH_COL}_despues']).fillna(False).to_numpy(dtype=bool),
+        ],
+        ['agregado', 'eliminado', 'modificado'],
+        default='sin_cambios'
+    )
+    comparison['cambio'] = change
+    comparison = comparison[comparison['cambio'] != 'sin_cambios'][[key_col, 'cambio']]
+
+    # Valores de la carga final para agregadas y modificadas; de la inicial para eliminadas
+    removed = comparison[comparison['cambio'] == 'eliminado'].merge(before_df, on=key_col, how='left')
+    current = comparison[comparison['cambio'] != 'eliminado'].merge(after_df, on=key_col, how='left')
+    return pd.concat([current, removed], ignore_index=True).drop(columns=[HASH_COL])
@@ -0,0 +1,122 @@
+import pandas as pd
+import numpy as np
+
+TOURISM_CATEGORIES = ['hospedaje', 'comida', 'transporte', 'entretenimiento']
+PRICE_LEVELS = ['precio_bajo_usd', 'precio_promedio_usd', 'precio_alto_usd']
+
+# País cuyo Big Mac se toma como referencia (paridad = 1). Si falta en un
+# snapshot se usa la mediana de ese snapshot.
+BASE_COUNTRY = 'USA'
+
+# Índice Big Mac: paridad de poder adquisitivo implícita y costos ajustados
+def group_codes(*keys):
+    # Combina una o más columnas de agrupación en un único código entero por fila
+    codes = np.zeros(len(keys[0]), dtype=np.int64)
+    for key in keys:
+        key_codes, uniques = pd.factorize(np.asarray(key, dtype=object), use_na_sentinel=False)
+        codes = codes * len(uniques) + key_codes
+    _, codes = np.unique(codes, return_inverse=True)
+    return codes.reshape(-1)
+
+def group_rank(values, groups):
+    # Ranking ordinal ascendente (1 = menor valor) y percentil dentro de cada grupo.
+    # Los valores nulos no participan y quedan con ranking y percentil nulos.
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    n_groups = groups.max() + 1 if len(groups) else 0
+
+    # lexsort ordena por grupo y luego por valor; los NaN quedan al final de cada grupo
+    order = np.lexsort((values, groups))
+    sorted_groups = groups[order]
+    group_start = np.searchsorted(sorted_groups, sorted_groups, side='left')
+    positions = np.arange(len(values)) - group_start + 1
+
+    ranks = np.empty(len(values), dtype=float)
+    ranks[order] = positions
+    ranks[~valid] = np.nan
+
+    valid_counts = np.bincount(groups[valid], minlength=n_groups)[groups]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentiles = np.where(valid_counts > 1, (ranks - 1) / (valid_counts - 1) * 100, 100.0)
+    percentiles[~valid] = np.nan
+    return ranks, percentiles
+
+def compute_ppp_ratios(big_mac_prices, countries, snapshots, base_country=BASE_COUNTRY):
+    # Paridad implícita = precio local del Big Mac en USD / precio del país base en el mismo snapshot
+    big_mac_prices = np.asarray(big_mac_prices, dtype=float)
+    n_snapshots = snapshots.max() + 1 if len(snapshots) else 0
+
+    base_prices = np.full(n_snapshots, np.nan)
+    is_base = (np.asarray(countries, dtype=object) == base_country) & ~np.isnan(big_mac_prices)
+    base_prices[snapshots[is_base]] = big_mac_prices[is_base]
+
+    missing_base = np.isnan(base_prices)
+    if missing_base.any():
+        # Mediana por snapshot para los snapshots sin país base
+        medians = pd.Series(big_mac_prices).groupby(snapshots).median().reindex(range(n_snapshots)).to_numpy()
+        base_prices[missing_base] = medians[missing_base]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = big_mac_prices / base_prices[snapshots]
+    ratios[~np.isfinite(ratios) | (ratios <= 0)] = np.nan
+    return ratios
+
+def compute_big_mac_index(df, base_country=BASE_COUNTRY, snapshot_col=None, group_cols=('continente', 'region')):
+    # Devuelve un DataFrame con las columnas nuevas, alineado con el índice de `df`.
+    # Con `snapshot_col` cada snapshot de precios se normaliza y ordena por separado.
+    index_df = pd.DataFrame(index=df.index)
+    if df.empty or 'precio_big_mac_usd' not in df.columns or 'pais' not in df.columns:
+        return index_df
+
+    n_rows = len(df)
+    if snapshot_col and snapshot_col in df.columns:
+        snapshots = group_codes(df[snapshot_col].to_numpy())
+    else:
+        snapshots = np.zeros(n_rows, dtype=np.int64)
+
+    big_mac_prices = pd.to_numeric(df['precio_big_mac_usd'], errors='coerce').to_numpy(dtype=float)
+    ratios = compute_ppp_ratios(big_mac_prices, df['pais'].to_numpy(), snapshots, base_country)
+    index_df['ratio_ppp_big_mac'] = ratios
+    index_df['valoracion_big_mac'] = ratios - 1
+
+    # Ajustar las 12 columnas de precios de turismo en una sola operación matricial
+    price_columns = [f'{category}.{level}' for category in TOURISM_CATEGORIES for level in PRICE_LEVELS]
+    price_columns = [col for col in price_columns if col in df.columns]
+    if 'costo_promedio_total' in df.columns:
+        price_columns.append('costo_promedio_total')
+    if not price_columns:
+        return index_df
+
+    prices = df[price_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    adjusted = prices / ratios[:, np.newaxis]
+    for position, col in enumerate(price_columns):
+        index_df[f'{col}_ppp'] = adjusted[:, position]
+
+    # Percentiles y rankings del costo ajustado por continente y región
+    ranking_col = 'costo_promedio_total_ppp' if 'costo_promedio_total_ppp' in index_df.columns else f'{price_columns[0]}_ppp'
+    ranking_values = index_df[ranking_col].to_numpy()
+    for group_col in group_cols:
+        if group_col not in df.columns:
+            continue
+        groups = group_codes(snapshots, df[group_col].to_numpy())
+        ranks, percentiles = group_rank(ranking_values, groups)
+        index_df[f'ranking_ppp_{group_col}'] = ranks
+        index_df[f'percentil_ppp_{group_col}'] = percentiles
+
+    return index_df
+
+def add_big_mac_index(df, base_country=BASE_COUNTRY, snapshot_col=None):
+    try:
+        index_df = compute_big_mac_index(df, base_country=base_country, snapshot_col=snapshot_col)
+        if index_df.empty or not len(index_df.columns):
+            print("No se pudo calcular el índice Big Mac: faltan columnas de precios")
+            return df
+
+        result_df = pd.concat([df.drop(columns=index_df.columns, errors='ignore'), index_df], axis=1)
+        with_ratio = result_df['ratio_ppp_big_mac'].notna().sum()
+        print(f"Índice Big Mac calculado: {with_ratio} de {len(result_df)} países con paridad implícita")
+        return result_df
+
+    except Exception as e:
+        print(f"Error al calcular el índice Big Mac: {str(e)}")
+        return df